@@ -1,42 +1,213 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, abort
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
+from werkzeug.exceptions import BadRequest, InternalServerError
+from werkzeug.http import http_date
 import mysql.connector
-from datetime import datetime
+import mysql.connector.pooling
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from uuid import UUID
+import atexit
 import math
+import numba
+import numpy as np
+import orjson
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+def _orjson_default(o):
+    """Serialize types orjson leaves to us the same way Flask's default provider does"""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (Decimal, UUID)):
+        return str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson"""
+    # Dates go through _orjson_default so history timestamps keep the
+    # HTTP-date format clients already parse
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping a decode/encode
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=self.option)
+        return self._app.response_class(body, mimetype="application/json")
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for Flutter app
 
+# Compress JSON responses of 1 KB or more (history pages, batch results)
+app.config.update(
+    COMPRESS_MIN_SIZE=1024,
+    COMPRESS_LEVEL=6,
+    COMPRESS_ALGORITHM=['br', 'gzip']
+)
+Compress(app)
+
 # Database configuration
-DB_CONFIG = {
-    'host': os.getenv('MYSQLHOST'),
-    'user': os.getenv('MYSQLUSER'),
-    'password': os.getenv('MYSQLPASSWORD'),
-    'database': os.getenv('MYSQLDATABASE'),
-    'port': int(os.getenv('MYSQLPORT', 3306))
-}
+@dataclass(frozen=True, slots=True)
+class DbCfg:
+    """MySQL connection settings, read once at startup"""
+    host: str
+    user: str
+    password: str = field(repr=False)
+    database: str
+    port: int
+
+def _load_db_config():
+    """Read database settings from the environment, failing fast if any are missing"""
+    env = {
+        'host': 'MYSQLHOST',
+        'user': 'MYSQLUSER',
+        'password': 'MYSQLPASSWORD',
+        'database': 'MYSQLDATABASE'
+    }
+    missing = [name for name in env.values() if os.getenv(name) is None]
+    if missing:
+        raise RuntimeError(f"Missing database environment variables: {', '.join(missing)}")
+    return DbCfg(
+        port=int(os.getenv('MYSQLPORT', 3306)),
+        **{attr: os.getenv(name) for attr, name in env.items()}
+    )
+
+DB_CFG = _load_db_config()
+
+# Connection pool size (mysql-connector caps this at 32)
+POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', 32))
+if not 1 <= POOL_SIZE <= 32:
+    raise RuntimeError("MYSQL_POOL_SIZE must be between 1 and 32")
+
+# Seconds to wait for each MySQL connect, so an unresponsive host fails
+# fast instead of blocking on an OS-level TCP timeout
+CONNECT_TIMEOUT = int(os.getenv('MYSQL_CONNECT_TIMEOUT', 5))
+
+# After a failed pool creation, callers get None for this many seconds
+# instead of queueing on the lock behind another attempt
+POOL_RETRY_DELAY = 5.0
+
+# Connection pool, created on first use and retried after POOL_RETRY_DELAY
+# if the database is unreachable. Sessions are not reset on release, so
+# autocommit keeps reads from pinning a stale snapshot on a reused
+# connection.
+POOL = None
+_pool_lock = threading.Lock()
+_pool_retry_at = 0.0
+
+def _get_pool():
+    """Return the connection pool, creating it if needed"""
+    global POOL, _pool_retry_at
+    if POOL is None and time.monotonic() >= _pool_retry_at:
+        with _pool_lock:
+            if POOL is None and time.monotonic() >= _pool_retry_at:
+                try:
+                    POOL = mysql.connector.pooling.MySQLConnectionPool(
+                        pool_name="disaster",
+                        pool_size=POOL_SIZE,
+                        pool_reset_session=False,
+                        autocommit=True,
+                        connection_timeout=CONNECT_TIMEOUT,
+                        **asdict(DB_CFG)
+                    )
+                except mysql.connector.Error as err:
+                    _pool_retry_at = time.monotonic() + POOL_RETRY_DELAY
+                    print(f"Database pool error: {err}")
+    return POOL
+
+# Simulation results waiting to be written. A background thread flushes
+# them with one multi-row INSERT per table every FLUSH_INTERVAL seconds, or
+# sooner once a buffer reaches FLUSH_THRESHOLD rows.
+FLUSH_INTERVAL = 0.5
+FLUSH_THRESHOLD = 100
+
+_buf_gempa = deque()
+_buf_banjir = deque()
+_buf_kebakaran = deque()
+_BUFFERS = {'gempa': _buf_gempa, 'banjir': _buf_banjir, 'kebakaran': _buf_kebakaran}
+_buf_lock = threading.Lock()
+_flush_wakeup = threading.Event()
+_writer_stop = threading.Event()
 
 def get_db_connection():
-    """Create and return database connection"""
+    """Get a connection from the pool; close() returns it to the pool"""
+    pool = _get_pool()
+    if pool is None:
+        return None
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        return pool.get_connection()
     except mysql.connector.Error as err:
         print(f"Database connection error: {err}")
         return None
 
-def normalize_value(value, min_val, max_val):
-    """Normalize value between 0 and 1"""
-    if max_val == min_val:
-        return 0.5
-    return (value - min_val) / (max_val - min_val)
+# Normalization: norm = (value - min) / (max - min). Divide rather than
+# multiply by a reciprocal, which would round 70 / 100 to 0.7000000000000001
+# and flip the explanation tier at exact thresholds.
+_MAG_MIN = 1.0
+_MAG_RANGE = 9.0           # magnitude 1-10 SR
+_DEPTH_RANGE = 700.0       # depth 0-700 km
+_DISTANCE_RANGE = 1000.0   # distance 0-1000 km
+_RAINFALL_RANGE = 500.0    # rainfall 0-500 mm/jam
+_ALTITUDE_RANGE = 3000.0   # altitude 0-3000 m
+_AREA_RANGE = 10000.0      # area 0-10000 m²
+_WIND_RANGE = 100.0        # wind speed 0-100 km/jam
 
-def calculate_earthquake_risk(magnitude, depth, distance):
+# Weights for each parameter
+_W_MAG, _W_DEPTH, _W_DISTANCE = 0.5, 0.3, 0.2
+_W_RAINFALL, _W_ALTITUDE, _W_DRAINAGE = 0.4, 0.3, 0.3
+_W_AREA, _W_MATERIAL, _W_WIND = 0.4, 0.3, 0.3
+
+# Scores for categorical parameters
+_DRAINAGE_SCORES = {"baik": 0.2, "sedang": 0.5, "buruk": 0.8}
+_MATERIAL_SCORES = {"sulit": 0.2, "sedang": 0.5, "mudah": 0.8}
+
+# Explanation templates, indexed by tier (0 = low, 1 = medium, 2 = high)
+_MAG_TIERS = ("Magnitudo {} SR rendah", "Magnitudo {} SR sedang", "Magnitudo {} SR tergolong tinggi")
+_DEPTH_TIERS = ("kedalaman gempa dangkal", "kedalaman gempa sedang", "kedalaman gempa dalam")
+_DISTANCE_TIERS = ("jarak dari pusat gempa dekat", "jarak dari pusat gempa sedang", "jarak dari pusat gempa jauh")
+_RAINFALL_TIERS = ("curah hujan {} mm/jam normal", "curah hujan {} mm/jam tinggi", "curah hujan {} mm/jam sangat tinggi")
+_ALTITUDE_TIERS = ("ketinggian wilayah rendah", "ketinggian wilayah sedang", "ketinggian wilayah cukup tinggi")
+_AREA_TIERS = ("luas area {} m² terbatas", "luas area {} m² cukup luas", "luas area {} m² sangat luas")
+_WIND_TIERS = ("kecepatan angin {} km/jam rendah", "kecepatan angin {} km/jam sedang", "kecepatan angin {} km/jam tinggi")
+_DRAINAGE_TEXT = "kondisi drainase {}"
+_MATERIAL_TEXT = "material {} terbakar"
+_EXPLANATION = "Berdasarkan parameter: {}."
+
+# Tier thresholds: a norm above 0.4/0.7 is medium/high (bisect_left), and
+# for depth/distance a norm below 0.3/0.7 is low/medium (bisect_right)
+_TIER_THRESH = (0.4, 0.7)
+_TIER_THRESH_DISTANCE = (0.3, 0.7)
+
+# Risk categories: below 40% is Rendah, below 70% Sedang, otherwise Tinggi
+_CAT_THRESH = (40.0, 70.0)
+_CATS = ("Rendah", "Sedang", "Tinggi")
+
+# Cached results per distinct input tuple. Numeric inputs are converted to
+# float and rounded before the lookup, so 10 and 10.0 share one entry and
+# the score and explanation reflect the rounded values.
+RISK_CACHE_SIZE = 4096
+_RESULT_KEYS = ("skor_risiko", "kategori_risiko", "penjelasan")
+
+@lru_cache(maxsize=RISK_CACHE_SIZE)
+def _earthquake_risk(magnitude, depth, distance):
     """
     Calculate earthquake risk based on parameters
     Formula: Risk = (W1*M + W2*(1-D) + W3*(1-dist)) * 100
@@ -48,66 +219,37 @@ def calculate_earthquake_risk(magnitude, depth, distance):
     - dist: Normalized distance (closer = more risk)
     """
     
-    # Normalize parameters
-    norm_magnitude = normalize_value(magnitude, 1.0, 10.0)
-    norm_depth = normalize_value(depth, 0, 700)  # Deeper is safer
-    norm_distance = normalize_value(distance, 0, 1000)  # Closer is more dangerous
-    
-    # Weights for each parameter
-    w_magnitude = 0.5  # Magnitude weight
-    w_depth = 0.3      # Depth weight (inverse relationship)
-    w_distance = 0.2   # Distance weight (inverse relationship)
+    # Normalize parameters, clamped to 0-1
+    norm_magnitude = min(1.0, max(0.0, (magnitude - _MAG_MIN) / _MAG_RANGE))
+    norm_depth = min(1.0, max(0.0, depth / _DEPTH_RANGE))  # Deeper is safer
+    norm_distance = min(1.0, max(0.0, distance / _DISTANCE_RANGE))  # Closer is more dangerous
     
     # Calculate risk score (0-1)
     risk_score = (
-        w_magnitude * norm_magnitude +
-        w_depth * (1 - norm_depth) +  # Inverse: deeper = less risk
-        w_distance * (1 - norm_distance)  # Inverse: closer = more risk
+        _W_MAG * norm_magnitude +
+        _W_DEPTH * (1 - norm_depth) +  # Inverse: deeper = less risk
+        _W_DISTANCE * (1 - norm_distance)  # Inverse: closer = more risk
     )
     
-    # Convert to percentage (0-100%)
-    risk_percentage = min(risk_score * 100, 100)
+    # Convert to percentage; norms are clamped and weights sum to 1,
+    # so this stays within 0-100%
+    risk_percentage = risk_score * 100
     
     # Determine category
-    if risk_percentage < 40:
-        category = "Rendah"
-    elif risk_percentage < 70:
-        category = "Sedang"
-    else:
-        category = "Tinggi"
+    category = _CATS[bisect_right(_CAT_THRESH, risk_percentage)]
     
     # Generate explanation
-    explanation_parts = []
-    if norm_magnitude > 0.7:
-        explanation_parts.append(f"Magnitudo {magnitude} SR tergolong tinggi")
-    elif norm_magnitude > 0.4:
-        explanation_parts.append(f"Magnitudo {magnitude} SR sedang")
-    else:
-        explanation_parts.append(f"Magnitudo {magnitude} SR rendah")
-    
-    if norm_depth < 0.3:
-        explanation_parts.append("kedalaman gempa dangkal")
-    elif norm_depth < 0.7:
-        explanation_parts.append("kedalaman gempa sedang")
-    else:
-        explanation_parts.append("kedalaman gempa dalam")
-    
-    if norm_distance < 0.3:
-        explanation_parts.append("jarak dari pusat gempa dekat")
-    elif norm_distance < 0.7:
-        explanation_parts.append("jarak dari pusat gempa sedang")
-    else:
-        explanation_parts.append("jarak dari pusat gempa jauh")
-    
-    explanation = f"Berdasarkan parameter: {', '.join(explanation_parts)}."
-    
-    return {
-        "skor_risiko": round(risk_percentage, 2),
-        "kategori_risiko": category,
-        "penjelasan": explanation
-    }
+    explanation_parts = [
+        _MAG_TIERS[bisect_left(_TIER_THRESH, norm_magnitude)].format(magnitude),
+        _DEPTH_TIERS[bisect_right(_TIER_THRESH_DISTANCE, norm_depth)],
+        _DISTANCE_TIERS[bisect_right(_TIER_THRESH_DISTANCE, norm_distance)]
+    ]
+    explanation = _EXPLANATION.format(', '.join(explanation_parts))
+    
+    return (round(risk_percentage, 2), category, explanation)
 
-def calculate_flood_risk(rainfall, altitude, drainage_condition):
+@lru_cache(maxsize=RISK_CACHE_SIZE)
+def _flood_risk(rainfall, altitude, drainage_condition):
     """
     Calculate flood risk based on parameters
     Formula: Risk = (W1*R + W2*(1-A) + W3*D) * 100
@@ -119,64 +261,39 @@ def calculate_flood_risk(rainfall, altitude, drainage_condition):
     - D: Drainage condition score (bad = higher risk)
     """
     
-    # Normalize parameters
-    norm_rainfall = normalize_value(rainfall, 0, 500)
-    norm_altitude = normalize_value(altitude, 0, 3000)  # Higher is safer
+    # Normalize parameters, clamped to 0-1
+    norm_rainfall = min(1.0, max(0.0, rainfall / _RAINFALL_RANGE))
+    norm_altitude = min(1.0, max(0.0, altitude / _ALTITUDE_RANGE))  # Higher is safer
     
     # Convert drainage condition to numerical value
-    drainage_scores = {"baik": 0.2, "sedang": 0.5, "buruk": 0.8}
-    drainage_score = drainage_scores.get(drainage_condition.lower(), 0.5)
-    
-    # Weights for each parameter
-    w_rainfall = 0.4
-    w_altitude = 0.3
-    w_drainage = 0.3
+    drainage_score = _DRAINAGE_SCORES.get(drainage_condition.lower(), 0.5)
     
     # Calculate risk score (0-1)
     risk_score = (
-        w_rainfall * norm_rainfall +
-        w_altitude * (1 - norm_altitude) +  # Inverse: higher altitude = less risk
-        w_drainage * drainage_score
+        _W_RAINFALL * norm_rainfall +
+        _W_ALTITUDE * (1 - norm_altitude) +  # Inverse: higher altitude = less risk
+        _W_DRAINAGE * drainage_score
     )
     
-    # Convert to percentage (0-100%)
-    risk_percentage = min(risk_score * 100, 100)
+    # Convert to percentage; norms are clamped and weights sum to 1,
+    # so this stays within 0-100%
+    risk_percentage = risk_score * 100
     
     # Determine category
-    if risk_percentage < 40:
-        category = "Rendah"
-    elif risk_percentage < 70:
-        category = "Sedang"
-    else:
-        category = "Tinggi"
+    category = _CATS[bisect_right(_CAT_THRESH, risk_percentage)]
     
     # Generate explanation
-    explanation_parts = []
-    if norm_rainfall > 0.7:
-        explanation_parts.append(f"curah hujan {rainfall} mm/jam sangat tinggi")
-    elif norm_rainfall > 0.4:
-        explanation_parts.append(f"curah hujan {rainfall} mm/jam tinggi")
-    else:
-        explanation_parts.append(f"curah hujan {rainfall} mm/jam normal")
-    
-    if norm_altitude > 0.7:
-        explanation_parts.append("ketinggian wilayah cukup tinggi")
-    elif norm_altitude > 0.4:
-        explanation_parts.append("ketinggian wilayah sedang")
-    else:
-        explanation_parts.append("ketinggian wilayah rendah")
-    
-    explanation_parts.append(f"kondisi drainase {drainage_condition}")
-    
-    explanation = f"Berdasarkan parameter: {', '.join(explanation_parts)}."
-    
-    return {
-        "skor_risiko": round(risk_percentage, 2),
-        "kategori_risiko": category,
-        "penjelasan": explanation
-    }
+    explanation_parts = [
+        _RAINFALL_TIERS[bisect_left(_TIER_THRESH, norm_rainfall)].format(rainfall),
+        _ALTITUDE_TIERS[bisect_left(_TIER_THRESH, norm_altitude)],
+        _DRAINAGE_TEXT.format(drainage_condition)
+    ]
+    explanation = _EXPLANATION.format(', '.join(explanation_parts))
+    
+    return (round(risk_percentage, 2), category, explanation)
 
-def calculate_fire_risk(area, material_type, wind_speed):
+@lru_cache(maxsize=RISK_CACHE_SIZE)
+def _fire_risk(area, material_type, wind_speed):
     """
     Calculate fire risk based on parameters
     Formula: Risk = (W1*Ar + W2*M + W3*W) * 100
@@ -188,216 +305,481 @@ def calculate_fire_risk(area, material_type, wind_speed):
     - W: Normalized wind speed (faster = more risk)
     """
     
-    # Normalize parameters
-    norm_area = normalize_value(area, 0, 10000)
-    norm_wind = normalize_value(wind_speed, 0, 100)
+    # Normalize parameters, clamped to 0-1
+    norm_area = min(1.0, max(0.0, area / _AREA_RANGE))
+    norm_wind = min(1.0, max(0.0, wind_speed / _WIND_RANGE))
     
     # Convert material type to numerical value
-    material_scores = {"sulit": 0.2, "sedang": 0.5, "mudah": 0.8}
-    material_score = material_scores.get(material_type.lower(), 0.5)
-    
-    # Weights for each parameter
-    w_area = 0.4
-    w_material = 0.3
-    w_wind = 0.3
+    material_score = _MATERIAL_SCORES.get(material_type.lower(), 0.5)
     
     # Calculate risk score (0-1)
     risk_score = (
-        w_area * norm_area +
-        w_material * material_score +
-        w_wind * norm_wind
+        _W_AREA * norm_area +
+        _W_MATERIAL * material_score +
+        _W_WIND * norm_wind
     )
     
-    # Convert to percentage (0-100%)
-    risk_percentage = min(risk_score * 100, 100)
+    # Convert to percentage; norms are clamped and weights sum to 1,
+    # so this stays within 0-100%
+    risk_percentage = risk_score * 100
     
     # Determine category
-    if risk_percentage < 40:
-        category = "Rendah"
-    elif risk_percentage < 70:
-        category = "Sedang"
-    else:
-        category = "Tinggi"
+    category = _CATS[bisect_right(_CAT_THRESH, risk_percentage)]
     
     # Generate explanation
-    explanation_parts = []
-    if norm_area > 0.7:
-        explanation_parts.append(f"luas area {area} m² sangat luas")
-    elif norm_area > 0.4:
-        explanation_parts.append(f"luas area {area} m² cukup luas")
-    else:
-        explanation_parts.append(f"luas area {area} m² terbatas")
-    
-    explanation_parts.append(f"material {material_type} terbakar")
-    
-    if norm_wind > 0.7:
-        explanation_parts.append(f"kecepatan angin {wind_speed} km/jam tinggi")
-    elif norm_wind > 0.4:
-        explanation_parts.append(f"kecepatan angin {wind_speed} km/jam sedang")
-    else:
-        explanation_parts.append(f"kecepatan angin {wind_speed} km/jam rendah")
-    
-    explanation = f"Berdasarkan parameter: {', '.join(explanation_parts)}."
-    
-    return {
-        "skor_risiko": round(risk_percentage, 2),
-        "kategori_risiko": category,
-        "penjelasan": explanation
-    }
+    explanation_parts = [
+        _AREA_TIERS[bisect_left(_TIER_THRESH, norm_area)].format(area),
+        _MATERIAL_TEXT.format(material_type),
+        _WIND_TIERS[bisect_left(_TIER_THRESH, norm_wind)].format(wind_speed)
+    ]
+    explanation = _EXPLANATION.format(', '.join(explanation_parts))
+    
+    return (round(risk_percentage, 2), category, explanation)
 
-def save_simulation_result(disaster_type, parameters, result):
-    """Save simulation result to database"""
-    conn = get_db_connection()
-    if not conn:
-        return False
-    
-    try:
+def calculate_earthquake_risk(magnitude, depth, distance):
+    """Calculate earthquake risk, cached on inputs rounded to 0.01 SR / 0.1 km"""
+    result = _earthquake_risk(round(float(magnitude), 2), round(float(depth), 1), round(float(distance), 1))
+    return dict(zip(_RESULT_KEYS, result))
+
+def calculate_flood_risk(rainfall, altitude, drainage_condition):
+    """Calculate flood risk, cached on inputs rounded to 0.1 mm/jam / 0.1 m"""
+    result = _flood_risk(round(float(rainfall), 1), round(float(altitude), 1), drainage_condition)
+    return dict(zip(_RESULT_KEYS, result))
+
+def calculate_fire_risk(area, material_type, wind_speed):
+    """Calculate fire risk, cached on inputs rounded to 0.1 m² / 0.1 km/jam"""
+    result = _fire_risk(round(float(area), 1), material_type, round(float(wind_speed), 1))
+    return dict(zip(_RESULT_KEYS, result))
+
+# INSERT statement per disaster type; timestamp is filled in by NOW()
+_INSERT_SQL = {
+    'gempa': """
+    INSERT INTO simulasi_gempa 
+    (magnitude, depth, distance, skor_risiko, kategori_risiko, timestamp)
+    VALUES (%s, %s, %s, %s, %s, NOW())
+    """,
+    'banjir': """
+    INSERT INTO simulasi_banjir 
+    (rainfall, altitude, drainage_condition, skor_risiko, kategori_risiko, timestamp)
+    VALUES (%s, %s, %s, %s, %s, NOW())
+    """,
+    'kebakaran': """
+    INSERT INTO simulasi_kebakaran 
+    (area, material_type, wind_speed, skor_risiko, kategori_risiko, timestamp)
+    VALUES (%s, %s, %s, %s, %s, NOW())
+    """
+}
+def save_simulation_result(disaster_type, args, result):
+    """Queue simulation result (validated risk function arguments) for the next batch insert"""
+    buf = _BUFFERS[disaster_type]
+    values = tuple(args) + (result['skor_risiko'], result['kategori_risiko'])
+    
+    with _buf_lock:
+        buf.append(values)
+        full = len(buf) >= FLUSH_THRESHOLD
+    if full:
+        _flush_wakeup.set()
+    return True
+
+# The batch writer keeps one pooled connection for its lifetime, with a
+# prepared INSERT cursor per disaster type, so statements are parsed once
+# per session. Only the writer thread (and the final flush after it has
+# stopped) touches these.
+_writer_conn = None
+_writer_stmts = {}
+
+def _get_writer_connection():
+    """Return the batch writer's connection, checking one out if needed"""
+    global _writer_conn
+    if _writer_conn is None:
+        _writer_conn = get_db_connection()
+    return _writer_conn
+
+def _release_writer_connection():
+    """Close the writer's prepared cursors and return its connection to the pool"""
+    global _writer_conn
+    for cursor in _writer_stmts.values():
+        try:
+            cursor.close()
+        except mysql.connector.Error:
+            pass
+    _writer_stmts.clear()
+    if _writer_conn is not None:
+        try:
+            _writer_conn.close()
+        except mysql.connector.Error:
+            pass
+        _writer_conn = None
+
+# Errors meaning the connection itself is unusable, as opposed to a bad row
+_CONNECTION_ERRORS = (mysql.connector.InterfaceError, mysql.connector.OperationalError)
+
+def _insert_rows(conn, disaster_type, rows):
+    """Insert one disaster type's rows in a single transaction"""
+    sql = _INSERT_SQL[disaster_type]
+    conn.start_transaction()
+    if len(rows) == 1:
+        # Single row: re-execute the prepared statement with just the
+        # parameters over the binary protocol
+        cursor = _writer_stmts.get(disaster_type)
+        if cursor is None:
+            cursor = _writer_stmts[disaster_type] = conn.cursor(prepared=True)
+        cursor.execute(sql, rows[0])
+    else:
+        # Several rows: one multi-row INSERT beats a prepared execute per row
         cursor = conn.cursor()
-        
-        # Prepare data for insertion
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        if disaster_type == 'gempa':
-            sql = """
-            INSERT INTO simulasi_gempa 
-            (magnitude, depth, distance, skor_risiko, kategori_risiko, timestamp)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                parameters['magnitude'],
-                parameters['depth'],
-                parameters['distance'],
-                result['skor_risiko'],
-                result['kategori_risiko'],
-                timestamp
-            )
-        elif disaster_type == 'banjir':
-            sql = """
-            INSERT INTO simulasi_banjir 
-            (rainfall, altitude, drainage_condition, skor_risiko, kategori_risiko, timestamp)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                parameters['rainfall'],
-                parameters['altitude'],
-                parameters['drainageCondition'],
-                result['skor_risiko'],
-                result['kategori_risiko'],
-                timestamp
-            )
-        else:  # kebakaran
-            sql = """
-            INSERT INTO simulasi_kebakaran 
-            (area, material_type, wind_speed, skor_risiko, kategori_risiko, timestamp)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            values = (
-                parameters['area'],
-                parameters['materialType'],
-                parameters['windSpeed'],
-                result['skor_risiko'],
-                result['kategori_risiko'],
-                timestamp
-            )
-        
-        cursor.execute(sql, values)
-        conn.commit()
+        cursor.executemany(sql, rows)
         cursor.close()
-        conn.close()
-        return True
-        
+    conn.commit()
+
+def _try_insert_rows(conn, disaster_type, rows):
+    """Insert rows, rolling back and returning the error if a row is rejected"""
+    try:
+        _insert_rows(conn, disaster_type, rows)
+        return None
     except Exception as e:
-        print(f"Error saving to database: {e}")
-        if conn:
-            conn.close()
-        return False
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            pass
+        if isinstance(e, _CONNECTION_ERRORS):
+            raise
+        return e
+
+def flush_simulation_results():
+    """Write all buffered simulation results to database"""
+    with _buf_lock:
+        batches = []
+        for disaster_type, buf in _BUFFERS.items():
+            if buf:
+                batches.append((disaster_type, list(buf)))
+                buf.clear()
+    
+    if not batches:
+        return True
+    
+    # One transaction per table, so a failure in one table doesn't roll
+    # back the others. If a multi-row batch fails, retry it row by row so
+    # only the offending rows are dropped. The writer's connection is not
+    # pinged before use; if it has gone stale, release it and retry what
+    # is still pending once on a fresh connection.
+    success = True
+    for _ in range(2):
+        conn = _get_writer_connection()
+        if not conn:
+            break
+        try:
+            while batches:
+                disaster_type, rows = batches[0]
+                err = _try_insert_rows(conn, disaster_type, rows)
+                if err is not None:
+                    success = False
+                    if len(rows) == 1:
+                        print(f"Error saving to database, dropped {disaster_type} row {rows[0]}: {err}")
+                    else:
+                        while rows:
+                            err = _try_insert_rows(conn, disaster_type, rows[:1])
+                            row = rows.pop(0)
+                            if err is not None:
+                                print(f"Error saving to database, dropped {disaster_type} row {row}: {err}")
+                batches.pop(0)
+            return success
+        except _CONNECTION_ERRORS as e:
+            print(f"Error saving to database: {e}")
+            _release_writer_connection()
+    
+    print(f"Database unavailable, dropped {sum(len(rows) for _, rows in batches)} simulation results")
+    return False
+
+def _batch_writer():
+    """Background loop flushing buffered results to database"""
+    while not _writer_stop.is_set():
+        _flush_wakeup.wait(FLUSH_INTERVAL)
+        _flush_wakeup.clear()
+        try:
+            flush_simulation_results()
+        except Exception as e:
+            print(f"Batch writer error: {e}")
+
+_writer_thread = threading.Thread(target=_batch_writer, name="db-batch-writer", daemon=True)
+_writer_thread.start()
+
+@atexit.register
+def _flush_pending_writes():
+    """Stop the writer and flush whatever is still buffered on shutdown"""
+    _writer_stop.set()
+    _flush_wakeup.set()
+    _writer_thread.join()
+    flush_simulation_results()
+    _release_writer_connection()
+
+# Maximum number of points per batch request
+BATCH_MAX_SIZE = 10000
+
+# Error messages, with their JSON bodies serialized once
+_MSG_INVALID_TYPE = "Jenis bencana tidak valid"
+_MSG_INVALID_PARAMS = "Parameter tidak valid"
+_MSG_BATCH_TOO_LARGE = f"Maksimal {BATCH_MAX_SIZE} data per permintaan"
+_MSG_DB_CONNECTION = "Database connection failed"
+_MSG_DB_QUERY = "Database query failed"
+_MSG_SERVER_ERROR = "Terjadi kesalahan pada server"
+_ERROR_BODIES = {
+    msg: orjson.dumps({"success": False, "message": msg})
+    for msg in (_MSG_INVALID_TYPE, _MSG_INVALID_PARAMS, _MSG_BATCH_TOO_LARGE,
+                _MSG_DB_CONNECTION, _MSG_DB_QUERY, _MSG_SERVER_ERROR)
+}
+
+@app.errorhandler(BadRequest)
+def handle_bad_request(e):
+    """Return 400 errors as JSON; werkzeug's own 400s map to invalid parameters"""
+    body = _ERROR_BODIES.get(e.description, _ERROR_BODIES[_MSG_INVALID_PARAMS])
+    return app.response_class(body, status=400, mimetype="application/json")
+
+@app.errorhandler(InternalServerError)
+def handle_server_error(e):
+    """Return 500 errors, including unhandled exceptions, as JSON"""
+    body = _ERROR_BODIES.get(e.description, _ERROR_BODIES[_MSG_SERVER_ERROR])
+    return app.response_class(body, status=500, mimetype="application/json")
+
+def _float_param(value):
+    """Convert a request value to a finite float"""
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError("non-finite value")
+    return value
+
+def _str_param(value):
+    """Accept only string request values"""
+    if not isinstance(value, str):
+        raise TypeError("expected a string")
+    return value
+
+# Risk function and (request key, converter, default) for each of its
+# arguments, per disaster type
+_CALC = {
+    'gempa': (calculate_earthquake_risk, (
+        ('magnitude', _float_param, 5.0),
+        ('depth', _float_param, 10.0),
+        ('distance', _float_param, 50.0)
+    )),
+    'banjir': (calculate_flood_risk, (
+        ('rainfall', _float_param, 50.0),
+        ('altitude', _float_param, 50.0),
+        ('drainageCondition', _str_param, 'sedang')
+    )),
+    'kebakaran': (calculate_fire_risk, (
+        ('area', _float_param, 100.0),
+        ('materialType', _str_param, 'sedang'),
+        ('windSpeed', _float_param, 10.0)
+    ))
+}
 
 @app.route('/api/calculate/<disaster_type>', methods=['POST'])
 def calculate_risk(disaster_type):
     """API endpoint to calculate disaster risk"""
+    handler, spec = _CALC.get(disaster_type) or abort(400, description=_MSG_INVALID_TYPE)
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400, description=_MSG_INVALID_PARAMS)
+    
     try:
-        data = request.get_json()
-        
-        if disaster_type == 'gempa':
-            magnitude = float(data.get('magnitude', 5.0))
-            depth = float(data.get('depth', 10.0))
-            distance = float(data.get('distance', 50.0))
-            
-            result = calculate_earthquake_risk(magnitude, depth, distance)
-            
-        elif disaster_type == 'banjir':
-            rainfall = float(data.get('rainfall', 50.0))
-            altitude = float(data.get('altitude', 50.0))
-            drainage_condition = data.get('drainageCondition', 'sedang')
-            
-            result = calculate_flood_risk(rainfall, altitude, drainage_condition)
-            
-        elif disaster_type == 'kebakaran':
-            area = float(data.get('area', 100.0))
-            material_type = data.get('materialType', 'sedang')
-            wind_speed = float(data.get('windSpeed', 10.0))
-            
-            result = calculate_fire_risk(area, material_type, wind_speed)
-            
-        else:
-            return jsonify({
-                "success": False,
-                "message": "Jenis bencana tidak valid"
-            }), 400
-        
-        # Save to database
-        save_simulation_result(disaster_type, data, result)
-        
-        return jsonify({
-            "success": True,
-            "data": result
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "message": f"Error: {str(e)}"
-        }), 500
+        args = [convert(data.get(key, default)) for key, convert, default in spec]
+    except (TypeError, ValueError):
+        abort(400, description=_MSG_INVALID_PARAMS)
+    
+    result = handler(*args)
+    
+    # Queue the validated arguments for the next batch insert
+    save_simulation_result(disaster_type, args, result)
+    
+    return jsonify({
+        "success": True,
+        "data": result
+    })
+
+# Batch kernels, compiled to native loops by numba. Each fills `out` with
+# risk (%) for 1-D float64 input arrays, normalizing exactly like the
+# scalar functions.
+@numba.njit(cache=True)
+def _kernel_gempa(magnitude, depth, distance, out):
+    for i in range(magnitude.shape[0]):
+        out[i] = (
+            _W_MAG * min(1.0, max(0.0, (magnitude[i] - _MAG_MIN) / _MAG_RANGE)) +
+            _W_DEPTH * (1 - min(1.0, max(0.0, depth[i] / _DEPTH_RANGE))) +
+            _W_DISTANCE * (1 - min(1.0, max(0.0, distance[i] / _DISTANCE_RANGE)))
+        ) * 100
+
+@numba.njit(cache=True)
+def _kernel_banjir(rainfall, altitude, drainage_score, out):
+    for i in range(rainfall.shape[0]):
+        out[i] = (
+            _W_RAINFALL * min(1.0, max(0.0, rainfall[i] / _RAINFALL_RANGE)) +
+            _W_ALTITUDE * (1 - min(1.0, max(0.0, altitude[i] / _ALTITUDE_RANGE))) +
+            _W_DRAINAGE * drainage_score[i]
+        ) * 100
+
+@numba.njit(cache=True)
+def _kernel_kebakaran(area, material_score, wind_speed, out):
+    for i in range(area.shape[0]):
+        out[i] = (
+            _W_AREA * min(1.0, max(0.0, area[i] / _AREA_RANGE)) +
+            _W_MATERIAL * material_score[i] +
+            _W_WIND * min(1.0, max(0.0, wind_speed[i] / _WIND_RANGE))
+        ) * 100
+
+def _run_kernel(kernel, *arrays):
+    """Run a batch kernel over same-shaped arrays and return risk (%)"""
+    shape = arrays[0].shape
+    flat = [np.ascontiguousarray(a, dtype=np.float64).ravel() for a in arrays]
+    out = np.empty(flat[0].shape[0])
+    kernel(*flat, out)
+    return out.reshape(shape)
+
+def _earthquake_risk_batch(magnitude, depth, distance):
+    """Vectorized earthquake risk (%) over arrays of parameters"""
+    return _run_kernel(_kernel_gempa, magnitude, depth, distance)
+
+def _flood_risk_batch(rainfall, altitude, drainage_score):
+    """Vectorized flood risk (%) over arrays of parameters"""
+    return _run_kernel(_kernel_banjir, rainfall, altitude, drainage_score)
+
+def _fire_risk_batch(area, material_score, wind_speed):
+    """Vectorized fire risk (%) over arrays of parameters"""
+    return _run_kernel(_kernel_kebakaran, area, material_score, wind_speed)
+
+# Compile (or load from cache) the kernels at startup rather than on the
+# first batch request
+for _batch_fn in (_earthquake_risk_batch, _flood_risk_batch, _fire_risk_batch):
+    _batch_fn(np.zeros(1), np.zeros(1), np.zeros(1))
+
+def _float_array(values):
+    """Convert a number or list of numbers to a finite float array"""
+    arr = np.asarray(values, dtype=float)
+    if not np.isfinite(arr).all():
+        raise ValueError("non-finite value")
+    return arr
+
+def _str_list(values):
+    """Accept a string or a list of strings"""
+    if isinstance(values, str):
+        return [values]
+    if not isinstance(values, list):
+        raise TypeError("expected a string or list of strings")
+    return [_str_param(v) for v in values]
+
+def _drainage_array(values):
+    """Convert drainage condition(s) to an array of scores"""
+    return np.array([_DRAINAGE_SCORES.get(v.lower(), 0.5) for v in _str_list(values)])
+
+def _material_array(values):
+    """Convert material type(s) to an array of scores"""
+    return np.array([_MATERIAL_SCORES.get(v.lower(), 0.5) for v in _str_list(values)])
+
+# Vectorized risk function and (request key, converter, default) per argument;
+# a scalar value is broadcast against the arrays
+_BATCH_CALC = {
+    'gempa': (_earthquake_risk_batch, (
+        ('magnitude', _float_array, 5.0),
+        ('depth', _float_array, 10.0),
+        ('distance', _float_array, 50.0)
+    )),
+    'banjir': (_flood_risk_batch, (
+        ('rainfall', _float_array, 50.0),
+        ('altitude', _float_array, 50.0),
+        ('drainageCondition', _drainage_array, 'sedang')
+    )),
+    'kebakaran': (_fire_risk_batch, (
+        ('area', _float_array, 100.0),
+        ('materialType', _material_array, 'sedang'),
+        ('windSpeed', _float_array, 10.0)
+    ))
+}
+
+@app.route('/api/calculate_batch/<disaster_type>', methods=['POST'])
+def calculate_risk_batch(disaster_type):
+    """API endpoint to calculate disaster risk for arrays of parameters"""
+    handler, spec = _BATCH_CALC.get(disaster_type) or abort(400, description=_MSG_INVALID_TYPE)
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        abort(400, description=_MSG_INVALID_PARAMS)
+    
+    values = [data.get(key, default) for key, _, default in spec]
+    # Reject oversized requests before converting anything
+    if any(isinstance(v, list) and len(v) > BATCH_MAX_SIZE for v in values):
+        abort(400, description=_MSG_BATCH_TOO_LARGE)
+    
+    try:
+        args = np.broadcast_arrays(*[
+            np.atleast_1d(convert(value)) for value, (_, convert, _) in zip(values, spec)
+        ])
+    except (TypeError, ValueError):
+        abort(400, description=_MSG_INVALID_PARAMS)
+    if args[0].size > BATCH_MAX_SIZE:
+        abort(400, description=_MSG_BATCH_TOO_LARGE)
+    
+    risk = handler(*args)
+    category = np.asarray(_CATS)[np.searchsorted(_CAT_THRESH, risk, side='right')]
+    
+    return jsonify({
+        "success": True,
+        "data": {
+            "skor_risiko": np.round(risk, 2).tolist(),
+            "kategori_risiko": category.tolist()
+        }
+    })
+
+# History page size: default and upper bound for ?limit=
+HISTORY_LIMIT = 10
+HISTORY_MAX_LIMIT = 100
+
+# Columns returned by the history endpoint, per disaster type
+_HISTORY_COLS = {
+    'gempa': ('id', 'magnitude', 'depth', 'distance', 'skor_risiko', 'kategori_risiko', 'timestamp'),
+    'banjir': ('id', 'rainfall', 'altitude', 'drainage_condition', 'skor_risiko', 'kategori_risiko', 'timestamp'),
+    'kebakaran': ('id', 'area', 'material_type', 'wind_speed', 'skor_risiko', 'kategori_risiko', 'timestamp')
+}
+
+# History query per disaster type, newest first
+_HISTORY_SQL = {
+    disaster_type: f"""
+    SELECT {', '.join(cols)}
+    FROM simulasi_{disaster_type} ORDER BY timestamp DESC LIMIT %s OFFSET %s
+    """
+    for disaster_type, cols in _HISTORY_COLS.items()
+}
 
 @app.route('/api/history/<disaster_type>', methods=['GET'])
 def get_history(disaster_type):
-    """API endpoint to get simulation history"""
+    """API endpoint to get simulation history (?offset=N&limit=M)"""
+    limit = min(max(request.args.get('limit', HISTORY_LIMIT, type=int), 1), HISTORY_MAX_LIMIT)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    page = (limit, offset)
+    
+    sql = _HISTORY_SQL.get(disaster_type) or abort(400, description=_MSG_INVALID_TYPE)
+    
     conn = get_db_connection()
     if not conn:
-        return jsonify({
-            "success": False,
-            "message": "Database connection failed"
-        }), 500
+        abort(500, description=_MSG_DB_CONNECTION)
     
     try:
-        cursor = conn.cursor(dictionary=True)
-        
-        if disaster_type == 'gempa':
-            cursor.execute("SELECT * FROM simulasi_gempa ORDER BY timestamp DESC LIMIT 10")
-        elif disaster_type == 'banjir':
-            cursor.execute("SELECT * FROM simulasi_banjir ORDER BY timestamp DESC LIMIT 10")
-        elif disaster_type == 'kebakaran':
-            cursor.execute("SELECT * FROM simulasi_kebakaran ORDER BY timestamp DESC LIMIT 10")
-        else:
-            return jsonify({
-                "success": False,
-                "message": "Jenis bencana tidak valid"
-            }), 400
-        
-        history = cursor.fetchall()
+        # Plain tuple rows, zipped with the known column names
+        cursor = conn.cursor()
+        cursor.execute(sql, page)
+        rows = cursor.fetchall()
         cursor.close()
+    except mysql.connector.Error as e:
+        print(f"Error reading history: {e}")
+        abort(500, description=_MSG_DB_QUERY)
+    finally:
         conn.close()
-        
-        return jsonify({
-            "success": True,
-            "data": history
-        })
-        
-    except Exception as e:
-        return jsonify({
-            "success": False,
-            "message": f"Error: {str(e)}"
-        }), 500
+    
+    cols = _HISTORY_COLS[disaster_type]
+    return jsonify({
+        "success": True,
+        "data": [dict(zip(cols, row)) for row in rows]
+    })
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -405,8 +787,14 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "service": "Disaster Simulation API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "cache": {
+            "gempa": _earthquake_risk.cache_info()._asdict(),
+            "banjir": _flood_risk.cache_info()._asdict(),
+            "kebakaran": _fire_risk.cache_info()._asdict()
+        }
     })
 
-if __name__ == '__main__':
+# Development server only; production runs under gunicorn (see wsgi.py)
+if __name__ == '__main__' and os.getenv('FLASK_DEBUG'):
     app.run(host='0.0.0.0', port=5000)
@@ -0,0 +1,24 @@
+"""Gunicorn configuration (loaded automatically from the working directory)"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Threaded workers: DB calls release the GIL, so each worker serves
+# `threads` requests concurrently
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+keepalive = 30
+
+# Each worker imports the app after forking, so it gets its own MySQL pool
+# and batch writer thread
+preload_app = False
+
+# Size each worker's pool to its request threads plus the batch writer,
+# which keeps one connection for its lifetime, instead of the
+# 32-connection default multiplied across every worker. mysql-connector
+# fails immediately when the pool is exhausted and caps it at 32.
+os.environ.setdefault('MYSQL_POOL_SIZE', str(threads + 1))
+if not threads + 1 <= int(os.environ['MYSQL_POOL_SIZE']) <= 32:
+    raise RuntimeError("MYSQL_POOL_SIZE must be between GUNICORN_THREADS + 1 and 32")
@@ -0,0 +1,8 @@
+-- Index the history tables on timestamp so /api/history can read the
+-- newest rows straight off the index instead of sorting the whole table.
+-- Descending indexes need MySQL 8.0+; on older servers drop DESC, the
+-- planner scans an ascending index backwards just as well.
+
+CREATE INDEX idx_timestamp_desc ON simulasi_gempa (timestamp DESC);
+CREATE INDEX idx_timestamp_desc ON simulasi_banjir (timestamp DESC);
+CREATE INDEX idx_timestamp_desc ON simulasi_kebakaran (timestamp DESC);
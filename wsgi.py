@@ -0,0 +1,2 @@
+"""WSGI entry point for gunicorn"""
+from app import app